@@ -7,13 +7,12 @@ Usage:
 """
 
 import sys
+import asyncio
 import argparse
 import logging
 from pathlib import Path
 from typing import List
 
-from src.agent_graph import StockAnalysisAgent, generate_portfolio_summary
-
 from src.utils import init_langsmith_tracing
 
 # Configure logging
@@ -55,8 +54,8 @@ def validate_tickers(tickers: List[str]) -> List[str]:
         logger.error("No tickers provided")
         sys.exit(1)
     
-    # Normalize to uppercase and remove duplicates
-    normalized = list(set(t.strip().upper() for t in tickers if t.strip()))
+    # Normalize to uppercase and remove duplicates, keeping first-seen order
+    normalized = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
     
     if not normalized:
         logger.error("No valid tickers after normalization")
@@ -83,24 +82,31 @@ def main():
     
     logger.info(f"Starting analysis for {len(tickers)} stock(s): {', '.join(tickers)}")
     
+    # Deferred so --help and argument errors don't pay for the heavy imports
+    from src.agent_graph import (
+        StockAnalysisAgent,
+        generate_portfolio_summary,
+        generate_portfolio_summary_iter,
+    )
+    
     try:
         # Initialize agent
         agent = StockAnalysisAgent()
         
-        # Analyze portfolio
-        results = agent.analyze_portfolio(tickers)
-        
-        # Generate summary report
-        report = generate_portfolio_summary(results)
+        # Analyze portfolio (LLM calls are issued concurrently)
+        results = asyncio.run(agent.analyze_portfolio_async(tickers))
         
-        # Output report
+        # Generate and output summary report
         if args.output:
             output_path = Path(args.output)
-            output_path.write_text(report)
+            # Stream the report section by section instead of building it in memory
+            with output_path.open("w") as f:
+                for chunk in generate_portfolio_summary_iter(results):
+                    f.write(chunk)
             logger.info(f"\nReport saved to: {output_path.absolute()}")
         else:
             print("\n" + "="*70)
-            print(report)
+            print(generate_portfolio_summary(results))
             print("="*70)
     
     except KeyboardInterrupt:
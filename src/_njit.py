@@ -0,0 +1,20 @@
+"""
+Optional Numba JIT support.
+
+Exposes ``njit``: numba's decorator when numba is installed, otherwise a
+no-op so decorated kernels still run as plain NumPy code. Loop-based kernels
+that are only fast when compiled should check ``NUMBA_AVAILABLE`` and keep a
+vectorized NumPy implementation for the default install.
+"""
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports bare and called forms)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+__all__ = ["njit"]
@@ -1,20 +1,29 @@
+import asyncio
+import contextlib
 import logging
-from typing import TypedDict, Optional, List, Dict, Any
-import json
+import threading
+from typing import TYPE_CHECKING, TypedDict, Callable, Iterator, Literal, Optional, List, Dict, Any
+import orjson
 from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 
 
-from pydantic import BaseModel, Field
+import yfinance as yf
+from pydantic import BaseModel, Field, ValidationError
+from langchain_core.exceptions import OutputParserException
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import PromptTemplate
 
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 
 from src.config import Config
 
-from src.prompts import system_prompt, user_prompt
+from src.utils import fetch_history
+from src.prompts import system_prompt, user_prompt, verdict_retry_prompt
 
 from src.tools.fundamental_analysis import perform_fundamental_analysis
 from src.tools.technical_analysis import get_technical_indicators  
@@ -22,6 +31,9 @@ from src.tools.news_analysis import fetch_realtime_news
 from src.tools.analyst_rating import check_analyst_ratings
 from src.tools.risk_analysis import calculate_risk_metrics
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -46,8 +58,11 @@ class AnalysisState(TypedDict):
 # LLM Structured Output Definition
 # ============================================================================
 
+VALID_VERDICTS = {"BUY", "HOLD", "SELL"}
+
+
 class StockDecision(BaseModel):
-    verdict: str = Field(
+    verdict: Literal["BUY", "HOLD", "SELL"] = Field(
         description='Final decision, one of: "BUY", "HOLD", "SELL".'
     )
     report: str = Field(
@@ -55,6 +70,75 @@ class StockDecision(BaseModel):
     )
 
 
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def _dumps(obj: Any) -> str:
+    """Serialize tool output for the LLM prompt (handles numpy values natively)"""
+    return orjson.dumps(
+        obj,
+        default=str,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+    ).decode()
+
+
+# Lazily-initialized LLM client, shared across stocks and threads
+_STRUCTURED_LLM = None
+_STRUCTURED_LLM_LOCK = threading.Lock()
+
+
+def _get_structured_llm():
+    """Create the OpenAI client once per process and return the structured LLM"""
+    global _STRUCTURED_LLM
+    
+    if _STRUCTURED_LLM is None:
+        with _STRUCTURED_LLM_LOCK:
+            if _STRUCTURED_LLM is None:
+                # Deferred import keeps module import (and CLI startup) light
+                from langchain_openai import ChatOpenAI
+                
+                llm = ChatOpenAI(
+                    model_name=Config.OPENAI_MODEL,
+                    temperature=0,
+                    openai_api_key=Config.OPENAI_API_KEY,
+                )
+                # structured output setup (OpenAI native JSON schema, validated server-side)
+                _STRUCTURED_LLM = llm.with_structured_output(
+                    StockDecision,
+                    method="json_schema",
+                    strict=True,
+                )
+    
+    return _STRUCTURED_LLM
+
+
+def _fetch_once(fetch: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Wrap a zero-argument fetch so it runs at most once, on first call.
+    Concurrent callers wait for that fetch; failures are not memoized.
+    """
+    lock = threading.Lock()
+    result = []
+    
+    def get():
+        with lock:
+            if not result:
+                result.append(fetch())
+            return result[0]
+    
+    return get
+
+
+def _history_or_none(ticker: str) -> Optional["pd.DataFrame"]:
+    """Fetch the shared price history; on failure leave it to each tool to retry"""
+    try:
+        return fetch_history(ticker, Config.HISTORY_PERIOD_DAYS)
+    except Exception as e:
+        logger.warning(f"Could not fetch price history for {ticker}: {e}")
+        return None
+
+
 # ============================================================================
 # WORKFLOW NODES
 # ============================================================================
@@ -66,40 +150,37 @@ def node_gather_data(state: AnalysisState) -> AnalysisState:
     ticker = state["ticker"]
     logger.info(f"\nSTEP 1: Gathering data for {ticker}...")
     
-    try:
-        state["fundamentals"] = perform_fundamental_analysis(ticker)
-        logger.info(f"Fundamentals gathered")
-    except Exception as e:
-        logger.error(f"Fundamental analysis failed: {e}")
-        state["errors"].append(f"Fundamental analysis: {e}")
-    
-    try:
-        state["technical"] = get_technical_indicators(ticker)
-        logger.info(f"Technical indicators calculated")
-    except Exception as e:
-        logger.error(f"Technical analysis failed: {e}")
-        state["errors"].append(f"Technical analysis: {e}")
-    
-    try:
-        state["news"] = fetch_realtime_news(ticker)
-        logger.info(f"News fetched and analyzed")
-    except Exception as e:
-        logger.error(f"News fetch failed: {e}")
-        state["errors"].append(f"News fetch: {e}")
+    # Share one Ticker, and fetch .info and the price history at most once.
+    # .info is fetched on first use only, so tools served from the file cache
+    # don't pay for the quoteSummary round-trip.
+    stock = yf.Ticker(ticker)
+    get_info = _fetch_once(lambda: stock.info)
+    get_hist = _fetch_once(partial(_history_or_none, ticker))
     
-    try:
-        state["analyst_ratings"] = check_analyst_ratings(ticker)
-        logger.info(f"Analyst ratings retrieved")
-    except Exception as e:
-        logger.error(f"Analyst ratings fetch failed: {e}")
-        state["errors"].append(f"Analyst ratings: {e}")
+    # Each tool is an independent network-bound call, so run them concurrently
+    tasks = {
+        "fundamentals": ("Fundamental analysis", partial(perform_fundamental_analysis, ticker, stock=stock, get_info=get_info)),
+        "technical": ("Technical analysis", lambda: get_technical_indicators(ticker, hist=get_hist())),
+        "news": ("News fetch", partial(fetch_realtime_news, ticker, stock=stock, get_info=get_info)),
+        "analyst_ratings": ("Analyst ratings", partial(check_analyst_ratings, ticker, stock=stock, get_info=get_info)),
+        "risk_metrics": ("Risk metrics", lambda: calculate_risk_metrics(ticker, hist=get_hist())),
+    }
     
-    try:
-        state["risk_metrics"] = calculate_risk_metrics(ticker)
-        logger.info(f"Risk metrics calculated")
-    except Exception as e:
-        logger.error(f"Risk metrics calculation failed: {e}")
-        state["errors"].append(f"Risk metrics: {e}")
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {
+            executor.submit(tool): key
+            for key, (_, tool) in tasks.items()
+        }
+        
+        for future in as_completed(futures):
+            key = futures[future]
+            label = tasks[key][0]
+            try:
+                state[key] = future.result()
+                logger.info(f"{label} completed")
+            except Exception as e:
+                logger.error(f"{label} failed: {e}")
+                state["errors"].append(f"{label}: {e}")
     
     return state
 
@@ -117,19 +198,19 @@ def node_synthesize_analysis(state: AnalysisState) -> AnalysisState:
     Stock Analysis Summary for {ticker}
     
     Fundamentals:
-    {json.dumps(state.get('fundamentals', {}), indent=2, default=str)}
+    {_dumps(state.get('fundamentals', {}))}
     
     Technical Indicators:
-    {json.dumps(state.get('technical', {}), indent=2, default=str)}
+    {_dumps(state.get('technical', {}))}
     
     News & Sentiment:
-    {json.dumps(state.get('news', {}), indent=2, default=str)}
+    {_dumps(state.get('news', {}))}
     
     Analyst Ratings:
-    {json.dumps(state.get('analyst_ratings', {}), indent=2, default=str)}
+    {_dumps(state.get('analyst_ratings', {}))}
     
     Risk Metrics:
-    {json.dumps(state.get('risk_metrics', {}), indent=2, default=str)}
+    {_dumps(state.get('risk_metrics', {}))}
     """
     
     state["synthesis"] = data_summary
@@ -143,49 +224,90 @@ def node_generate_verdict_and_report(state: AnalysisState) -> AnalysisState:
     """
     logger.info(f"\nSTEP 3: Generating verdict and report...")
     
-    ticker = state["ticker"]
+    try:
+        messages = _verdict_messages(state)
+        structured_llm = _get_structured_llm()
+        
+        # invoke LLM, retrying once with a reminder if the output is malformed
+        try:
+            result = _validate_decision(structured_llm.invoke(messages))
+        except (ValidationError, OutputParserException, ValueError) as e:
+            logger.warning(f"Malformed verdict for {state['ticker']}, retrying: {e}")
+            result = _validate_decision(structured_llm.invoke(_with_retry_reminder(messages)))
+        
+        return _apply_decision(state, result)
+    
+    except Exception as e:
+        return _apply_decision_error(state, e)
+
+
+async def anode_generate_verdict_and_report(
+    state: AnalysisState, config: RunnableConfig
+) -> AnalysisState:
+    """
+    Step 3 (async): Generate final verdict and detailed report using LLM.
+    Concurrency is bounded by the semaphore passed in the run config.
+    """
+    logger.info(f"\nSTEP 3: Generating verdict and report...")
+    
+    semaphore = config.get("configurable", {}).get("llm_semaphore") or contextlib.nullcontext()
     
     try:
-        # initialize LLM
-        llm = ChatOpenAI(
-            model_name=Config.OPENAI_MODEL,
-            temperature=0.3,
-            openai_api_key=Config.OPENAI_API_KEY,
-        )
+        messages = _verdict_messages(state)
+        structured_llm = _get_structured_llm()
         
-        # structured output setup
-        structured_llm = llm.with_structured_output(StockDecision)
-
-        # prompts for the analysis
-        sys_msg = SystemMessage(content=system_prompt())
-        usr_msg = HumanMessage(content=user_prompt(ticker, state))
-
-        # invoke LLM
-        result: StockDecision = structured_llm.invoke([sys_msg, usr_msg])
-
-        verdict_raw = (result.verdict or "").upper().strip()
-        if verdict_raw not in {"BUY", "HOLD", "SELL"}:
-            # Fallback normalization
-            if "BUY" in verdict_raw:
-                verdict = "BUY"
-            elif "SELL" in verdict_raw:
-                verdict = "SELL"
-            else:
-                verdict = "HOLD"
-        else:
-            verdict = verdict_raw
-
-        state["verdict"] = verdict
-        state["report"] = result.report
-        logger.info(f"Verdict generated: {verdict}")
-        return state
+        async with semaphore:
+            # invoke LLM, retrying once with a reminder if the output is malformed
+            try:
+                result = _validate_decision(await structured_llm.ainvoke(messages))
+            except (ValidationError, OutputParserException, ValueError) as e:
+                logger.warning(f"Malformed verdict for {state['ticker']}, retrying: {e}")
+                result = _validate_decision(
+                    await structured_llm.ainvoke(_with_retry_reminder(messages))
+                )
+        
+        return _apply_decision(state, result)
     
     except Exception as e:
-        logger.error(f"Error generating verdict: {e}")
-        state["errors"].append(f"Verdict generation: {e}")
-        state["verdict"] = ""
-        state["report"] = f"Error generating report: {e}"
-        return state
+        return _apply_decision_error(state, e)
+
+
+def _verdict_messages(state: AnalysisState) -> List[BaseMessage]:
+    """Build the prompt messages for the verdict LLM call"""
+    # the system prefix is identical across stocks so OpenAI can serve it
+    # from its prompt cache
+    sys_msg = SystemMessage(content=system_prompt())
+    usr_msg = HumanMessage(content=user_prompt(state["ticker"], state))
+    return [sys_msg, usr_msg]
+
+
+def _with_retry_reminder(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Append a re-emphasized output format reminder for the retry call"""
+    return messages + [HumanMessage(content=verdict_retry_prompt())]
+
+
+def _validate_decision(result: Optional[StockDecision]) -> StockDecision:
+    """Reject missing or out-of-range verdicts instead of silently coercing them"""
+    if result is None or result.verdict not in VALID_VERDICTS:
+        raise ValueError(f"Invalid verdict: {getattr(result, 'verdict', None)!r}")
+    return result
+
+
+def _apply_decision(state: AnalysisState, result: StockDecision) -> AnalysisState:
+    """Store the validated LLM decision in the state"""
+    state["verdict"] = result.verdict
+    state["report"] = result.report
+    logger.info(f"Verdict generated: {result.verdict}")
+    return state
+
+
+def _apply_decision_error(state: AnalysisState, e: Exception) -> AnalysisState:
+    """Record a failed verdict generation in the state"""
+    logger.error(f"Error generating verdict: {e}")
+    state["errors"].append(f"Verdict generation: {e}")
+    state["verdict"] = ""
+    state["report"] = f"Error generating report: {e}"
+    return state
 
 
 # ============================================================================
@@ -201,7 +323,11 @@ def build_analysis_graph():
     # Add nodes
     workflow.add_node("gather_data", node_gather_data)
     workflow.add_node("synthesize_analysis", node_synthesize_analysis)
-    workflow.add_node("generate_verdict", node_generate_verdict_and_report)
+    workflow.add_node(
+        "generate_verdict",
+        # sync node for .invoke(), async node for .ainvoke()
+        RunnableLambda(node_generate_verdict_and_report, afunc=anode_generate_verdict_and_report),
+    )
     
     # Add edges (workflow sequence)
     workflow.add_edge("gather_data", "synthesize_analysis")
@@ -214,6 +340,10 @@ def build_analysis_graph():
     return workflow.compile()
 
 
+# Compile once per process; the graph is stateless and state is passed per invoke
+_COMPILED_GRAPH = build_analysis_graph()
+
+
 # ============================================================================
 # AGENT EXECUTION
 # ============================================================================
@@ -224,7 +354,7 @@ class StockAnalysisAgent:
     """
     
     def __init__(self):
-        self.graph = build_analysis_graph()
+        self.graph = _COMPILED_GRAPH
     
     def analyze_stock(self, ticker: str) -> Dict[str, Any]:
         """
@@ -240,30 +370,35 @@ class StockAnalysisAgent:
         logger.info(f"ANALYZING: {ticker}".center(70))
         logger.info(f"{'='*70}")
         
-        # Initialize state
-        initial_state: AnalysisState = {
-            "ticker": ticker,
-            "fundamentals": None,
-            "technical": None,
-            "news": None,
-            "analyst_ratings": None,
-            "risk_metrics": None,
-            "synthesis": None,
-            "verdict": None,
-            "report": None,
-            "errors": [],
-        }
-        
         # Execute workflow
-        final_state = self.graph.invoke(initial_state)
+        final_state = self.graph.invoke(_initial_state(ticker))
         
-        return {
-            "ticker": ticker,
-            "verdict": final_state.get("verdict"),
-            "report": final_state.get("report"),
-            "errors": final_state.get("errors", []),
-            "timestamp": datetime.now().isoformat(),
-        }
+        return _to_result(ticker, final_state)
+    
+    async def analyze_stock_async(
+        self, ticker: str, llm_semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze a single stock asynchronously.
+        
+        Args:
+            ticker: Stock ticker symbol
+            llm_semaphore: Optional semaphore bounding concurrent LLM calls
+        
+        Returns:
+            Dictionary with verdict and report
+        """
+        logger.info(f"\n{'='*70}")
+        logger.info(f"ANALYZING: {ticker}".center(70))
+        logger.info(f"{'='*70}")
+        
+        # Execute workflow; synchronous nodes run in worker threads
+        final_state = await self.graph.ainvoke(
+            _initial_state(ticker),
+            config={"configurable": {"llm_semaphore": llm_semaphore}},
+        )
+        
+        return _to_result(ticker, final_state)
     
     def analyze_portfolio(self, tickers: List[str]) -> List[Dict[str, Any]]:
         """
@@ -275,18 +410,81 @@ class StockAnalysisAgent:
         Returns:
             List of analysis results
         """
-        results = []
-        
         logger.info(f"\n\n{'='*70}")
         logger.info(f"PORTFOLIO ANALYSIS: {len(tickers)} STOCKS".center(70))
         logger.info(f"Tickers: {', '.join(tickers)}".center(70))
         logger.info(f"{'='*70}")
         
-        for ticker in tickers:
-            result = self.analyze_stock(ticker)
-            results.append(result)
+        if not tickers:
+            return []
+        
+        # Stock analyses share no mutable state, so run them concurrently
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tickers)
+        max_workers = min(len(tickers), Config.MAX_PARALLEL_STOCKS)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.analyze_stock, ticker): i
+                for i, ticker in enumerate(tickers)
+            }
+            
+            # Preserve the original ticker order in the results
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
         
         return results
+    
+    async def analyze_portfolio_async(
+        self, tickers: List[str], max_concurrent_llm: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze multiple stocks concurrently, issuing the LLM calls as one async batch.
+        
+        Args:
+            tickers: List of stock ticker symbols
+            max_concurrent_llm: Maximum number of in-flight LLM requests
+        
+        Returns:
+            List of analysis results, in the same order as tickers
+        """
+        logger.info(f"\n\n{'='*70}")
+        logger.info(f"PORTFOLIO ANALYSIS: {len(tickers)} STOCKS".center(70))
+        logger.info(f"Tickers: {', '.join(tickers)}".center(70))
+        logger.info(f"{'='*70}")
+        
+        # Bound concurrent LLM requests to respect provider rate limits
+        llm_semaphore = asyncio.Semaphore(max_concurrent_llm or Config.MAX_CONCURRENT_LLM)
+        
+        return await asyncio.gather(
+            *(self.analyze_stock_async(ticker, llm_semaphore) for ticker in tickers)
+        )
+
+
+def _initial_state(ticker: str) -> AnalysisState:
+    """Create the empty workflow state for a ticker"""
+    return {
+        "ticker": ticker,
+        "fundamentals": None,
+        "technical": None,
+        "news": None,
+        "analyst_ratings": None,
+        "risk_metrics": None,
+        "synthesis": None,
+        "verdict": None,
+        "report": None,
+        "errors": [],
+    }
+
+
+def _to_result(ticker: str, final_state: AnalysisState) -> Dict[str, Any]:
+    """Extract the public analysis result from the final workflow state"""
+    return {
+        "ticker": ticker,
+        "verdict": final_state.get("verdict"),
+        "report": final_state.get("report"),
+        "errors": final_state.get("errors", []),
+        "timestamp": datetime.now().isoformat(),
+    }
 
 
 # ============================================================================
@@ -297,27 +495,35 @@ def generate_portfolio_summary(results: List[Dict[str, Any]]) -> str:
     """
     Generate a comprehensive portfolio summary report.
     """
-    summary = f"""
+    return "".join(generate_portfolio_summary_iter(results))
+
+
+def generate_portfolio_summary_iter(results: List[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Yield the portfolio summary report section by section, so it can be
+    streamed to a file without building the whole report in memory.
+    """
+    counts = Counter(r['verdict'] for r in results)
+    
+    yield f"""
 # Stock Portfolio Analysis Report
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ## Portfolio Overview
 - **Total Stocks Analyzed**: {len(results)}
-- **BUY Recommendations**: {sum(1 for r in results if r['verdict'] == 'BUY')}
-- **HOLD Recommendations**: {sum(1 for r in results if r['verdict'] == 'HOLD')}
-- **SELL Recommendations**: {sum(1 for r in results if r['verdict'] == 'SELL')}
+- **BUY Recommendations**: {counts['BUY']}
+- **HOLD Recommendations**: {counts['HOLD']}
+- **SELL Recommendations**: {counts['SELL']}
 
 ## Individual Stock Analysis
 
 """
     
     for i, result in enumerate(results, 1):
-        summary += f"""
+        yield f"""
 ### {i}. {result['ticker']} - **{result['verdict']}**
 {result.get('report', 'No report available')}
 
 ---
 
 """
-    
-    return summary
\ No newline at end of file
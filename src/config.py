@@ -9,7 +9,7 @@ class Config:
     
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-    OPENAI_MODEL = "gpt-4-turbo-preview"
+    OPENAI_MODEL = "gpt-4o"  # must support JSON schema structured outputs
     
     # News API Configuration
     NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
@@ -23,6 +23,15 @@ class Config:
     # Agent Configuration
     MAX_RETRIES = 3
     TIMEOUT_SECONDS = 30
+    MAX_PARALLEL_STOCKS = 8  # concurrent stock analyses in a portfolio run
+    MAX_CONCURRENT_LLM = 5  # in-flight LLM requests for async portfolio runs
+
+    # Tool Result Cache Configuration
+    CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+    CACHE_TTL_FUNDAMENTALS = 24 * 60 * 60  # seconds
+    CACHE_TTL_ANALYST_RATINGS = 24 * 60 * 60
+    CACHE_TTL_NEWS = 4 * 60 * 60
+    HISTORY_CACHE_TTL = 5 * 60  # in-memory price history, seconds
     
     # Analysis Configuration
     TECHNICAL_PERIOD_SHORT = 50  # days for short-term SMA
@@ -30,6 +39,11 @@ class Config:
     RSI_PERIOD = 14
     NEWS_ARTICLES_LIMIT = 10
 
+    # Sentiment Model Configuration (quantization needs optimum[onnxruntime], see README)
+    SENTIMENT_QUANTIZE = os.getenv("SENTIMENT_QUANTIZE", "false").lower() in ("1", "true", "yes")
+    SENTIMENT_ONNX_DIR = os.getenv("SENTIMENT_ONNX_DIR", ".cache/onnx/sentiment")
+
+    HISTORY_PERIOD_DAYS = 252  # shared price history for technical and risk tools
     BENCHMARK_INDEX = "^NSEI"  # Nifty50 Index for beta calculation
     
     # Stock Analysis Thresholds
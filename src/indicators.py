@@ -0,0 +1,55 @@
+"""
+Numeric indicator helpers (SMA, RSI).
+
+Kept out of src.utils so that importing the CLI does not load NumPy or
+numba; they are only imported once a technical analysis actually runs.
+"""
+
+from typing import Optional, Sequence
+import numpy as np
+from src._njit import njit
+
+
+@njit(cache=True)
+def _sma_kernel(prices: np.ndarray, period: int) -> float:
+    return prices[-period:].mean()
+
+
+@njit(cache=True)
+def _rsi_kernel(prices: np.ndarray, period: int) -> float:
+    # Only the last `period` deltas are used, so only diff the tail
+    deltas = np.diff(prices[-(period + 1):])
+    
+    avg_gain = np.maximum(deltas, 0.0).mean()
+    avg_loss = -np.minimum(deltas, 0.0).mean()
+    
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 0.0
+    
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def calculate_sma(prices: Sequence[float], period: int) -> Optional[float]:
+    """Calculate Simple Moving Average"""
+    if prices is None or len(prices) < period:
+        return None
+    return float(_sma_kernel(np.ascontiguousarray(prices, dtype=np.float64), period))
+
+
+def sma_series(prices: Sequence[float], period: int) -> np.ndarray:
+    """Calculate the full rolling Simple Moving Average series in O(n)"""
+    arr = np.asarray(prices, dtype=np.float64)
+    if arr.size < period:
+        return np.empty(0)
+    cs = np.cumsum(np.concatenate(([0.0], arr)))
+    return (cs[period:] - cs[:-period]) / period
+
+
+def calculate_rsi(prices: Sequence[float], period: int = 14) -> Optional[float]:
+    """Calculate Relative Strength Index (RSI)"""
+    if prices is None or len(prices) < period + 1:
+        return None
+    
+    rsi = _rsi_kernel(np.ascontiguousarray(prices, dtype=np.float64), period)
+    return round(float(rsi), 2)
@@ -1,19 +1,36 @@
 import logging
 import yfinance as yf
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Callable
 
+from src.config import Config
+from src.tools.cache import file_cache
 from src.utils import (
     safe_extract
 )
 
 logger = logging.getLogger(__name__)
 
-def check_analyst_ratings(ticker: str) -> Dict[str, Any]:
+_RECOMMENDATION_MAP = {
+    "strongBuy": "Strong Buy",
+    "buy": "Buy",
+    "hold": "Hold",
+    "sell": "Sell",
+    "strongSell": "Strong Sell",
+    "none": "No Rating",
+}
+
+def check_analyst_ratings(
+    ticker: str,
+    stock: Optional[yf.Ticker] = None,
+    get_info: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
     """
     Fetch consensus analyst ratings and price targets.
     
     Args:
         ticker: Stock ticker symbol
+        stock: Shared yfinance Ticker for this symbol (created if omitted)
+        get_info: Shared getter for ``stock.info``, called only on a cache miss
     
     Returns:
         Dictionary containing analyst ratings and targets
@@ -21,8 +38,14 @@ def check_analyst_ratings(ticker: str) -> Dict[str, Any]:
     try:
         logger.info(f"Fetching analyst ratings for {ticker}...")
         
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        cache_key = ("analyst_ratings", ticker)
+        cached = file_cache.get(cache_key, Config.CACHE_TTL_ANALYST_RATINGS)
+        if cached is not None:
+            return cached
+        
+        if stock is None:
+            stock = yf.Ticker(ticker)
+        info = get_info() if get_info is not None else stock.info
         
         ratings = {
             "ticker": ticker,
@@ -34,6 +57,9 @@ def check_analyst_ratings(ticker: str) -> Dict[str, Any]:
             "recommendation": map_recommendation(safe_extract(info, "recommendationKey")),
         }
 
+        # An empty info usually means a transient yfinance failure; don't cache it
+        if info:
+            file_cache.set(cache_key, ratings)
         logger.info(f"Analyst ratings fetch completed for {ticker}")
         return ratings
     
@@ -49,12 +75,4 @@ def check_analyst_ratings(ticker: str) -> Dict[str, Any]:
 
 def map_recommendation(key: Optional[str]) -> str:
     """Map yfinance recommendation key to human-readable format"""
-    recommendation_map = {
-        "strongBuy": "Strong Buy",
-        "buy": "Buy",
-        "hold": "Hold",
-        "sell": "Sell",
-        "strongSell": "Strong Sell",
-        "none": "No Rating",
-    }
-    return recommendation_map.get(key, "Unknown")
\ No newline at end of file
+    return _RECOMMENDATION_MAP.get(key, "Unknown")
\ No newline at end of file
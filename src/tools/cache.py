@@ -0,0 +1,73 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class FileCache:
+    """
+    Persistent JSON cache for tool results with per-entry TTL.
+
+    Entries are keyed by (function_name, ticker, *params) and stored as
+    <root>/<ticker>/<function_name>.json alongside the time they were written.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = Path(root or Config.CACHE_DIR)
+
+    def _path(self, key: Tuple) -> Path:
+        fn_name, ticker, *params = key
+        filename = fn_name
+        if params:
+            digest = hashlib.md5(json.dumps(params, default=str).encode()).hexdigest()[:8]
+            filename = f"{fn_name}_{digest}"
+        return self.root / str(ticker).replace("/", "_") / f"{filename}.json"
+
+    def get(self, key: Tuple, ttl_seconds: int) -> Optional[Any]:
+        """Return the cached value, or None if missing or older than ttl_seconds"""
+        path = self._path(key)
+        try:
+            with path.open() as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+        if time.time() - entry.get("timestamp", 0) > ttl_seconds:
+            return None
+
+        logger.info(f"Cache hit for {key[0]} ({key[1]})")
+        return entry.get("value")
+
+    def set(self, key: Tuple, value: Any) -> None:
+        """Store a value; failures are logged and otherwise ignored"""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write atomically so concurrent readers never see partial files
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"timestamp": time.time(), "value": value}, f, default=_to_json)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry {path}: {e}")
+
+
+def _to_json(obj: Any) -> Any:
+    """Convert numpy/pandas scalars to plain Python values"""
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+
+file_cache = FileCache()
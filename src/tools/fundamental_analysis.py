@@ -1,7 +1,9 @@
 import logging
 import yfinance as yf
-from typing import Dict, Any
+from typing import Dict, Optional, Any, Callable
 
+from src.config import Config
+from src.tools.cache import file_cache
 from src.utils import (
     safe_extract
 )
@@ -9,12 +11,18 @@ from src.utils import (
 logger = logging.getLogger(__name__)
 
 
-def perform_fundamental_analysis(ticker: str) -> Dict[str, Any]:
+def perform_fundamental_analysis(
+    ticker: str,
+    stock: Optional[yf.Ticker] = None,
+    get_info: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
     """
     Perform comprehensive fundamental analysis for a given stock ticker.
     
     Args:
         ticker: Stock ticker symbol (e.g., "AAPL")
+        stock: Shared yfinance Ticker for this symbol (created if omitted)
+        get_info: Shared getter for ``stock.info``, called only on a cache miss
     
     Returns:
         Dictionary containing fundamental metrics
@@ -22,8 +30,14 @@ def perform_fundamental_analysis(ticker: str) -> Dict[str, Any]:
     try:
         logger.info(f"Fetching fundamental data for {ticker}...")
         
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        cache_key = ("fundamentals", ticker)
+        cached = file_cache.get(cache_key, Config.CACHE_TTL_FUNDAMENTALS)
+        if cached is not None:
+            return cached
+        
+        if stock is None:
+            stock = yf.Ticker(ticker)
+        info = get_info() if get_info is not None else stock.info
         
         # Extract key metrics
         fundamentals = {
@@ -61,6 +75,9 @@ def perform_fundamental_analysis(ticker: str) -> Dict[str, Any]:
             if not hist.empty:
                 fundamentals["current_price"] = hist["Close"].iloc[-1]
         
+        # An empty info usually means a transient yfinance failure; don't cache it
+        if info:
+            file_cache.set(cache_key, fundamentals)
         logger.info(f"Fundamental analysis completed for {ticker}")
         return fundamentals
     
@@ -1,24 +1,121 @@
 import logging
+import threading
 import yfinance as yf
 import requests
-from typing import Dict, Any
-from transformers import pipeline
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable
 
 from src.config import Config
+from src.tools.cache import file_cache
 from src.utils import (
     safe_extract
 )
 
 logger = logging.getLogger(__name__)
 
+SENTIMENT_MODEL = "mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis"
 
-def fetch_realtime_news(ticker: str, limit: int = None) -> Dict[str, Any]:
+# Shared HTTP session so NewsAPI connections stay warm across calls
+_HTTP = requests.Session()
+_HTTP.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(
+            total=Config.MAX_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+        ),
+    ),
+)
+
+# Lazily-initialized sentiment pipeline, shared across calls and threads.
+# Inference is serialized too: the fast (Rust) tokenizer mutates its
+# truncation/padding state per call and is not safe to use concurrently.
+_SENTIMENT_PIPELINE = None
+_SENTIMENT_PIPELINE_LOCK = threading.Lock()
+_SENTIMENT_INFERENCE_LOCK = threading.Lock()
+
+
+def _get_sentiment_pipeline():
+    """Load the sentiment model once per process and return the cached pipeline"""
+    global _SENTIMENT_PIPELINE
+    
+    if _SENTIMENT_PIPELINE is None:
+        with _SENTIMENT_PIPELINE_LOCK:
+            if _SENTIMENT_PIPELINE is None:
+                _SENTIMENT_PIPELINE = _load_sentiment_pipeline()
+    
+    return _SENTIMENT_PIPELINE
+
+
+def _load_sentiment_pipeline():
+    """Prefer the int8 ONNX model on CPU, falling back to the PyTorch model"""
+    # Heavy imports are deferred until the model is first needed
+    import torch
+    from transformers import AutoTokenizer, pipeline
+    
+    if Config.SENTIMENT_QUANTIZE and not torch.cuda.is_available():
+        try:
+            return _load_quantized_sentiment_pipeline()
+        except ImportError:
+            logger.warning("SENTIMENT_QUANTIZE needs optimum[onnxruntime], using PyTorch sentiment model")
+        except Exception as e:
+            logger.warning(f"Quantized sentiment model unavailable, using PyTorch model: {e}")
+    
+    logger.info(f"Loading sentiment model {SENTIMENT_MODEL}...")
+    return pipeline(
+        "text-classification",
+        model=SENTIMENT_MODEL,
+        tokenizer=AutoTokenizer.from_pretrained(SENTIMENT_MODEL, use_fast=True),
+        device=0 if torch.cuda.is_available() else -1,
+    )
+
+
+def _load_quantized_sentiment_pipeline():
+    """
+    Load the sentiment model as a dynamically int8-quantized ONNX model.
+    The export and quantization run once; the result is cached on disk.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer, pipeline
+    
+    save_dir = Path(Config.SENTIMENT_ONNX_DIR)
+    model_file = save_dir / "model_quantized.onnx"
+    
+    if not model_file.exists():
+        logger.info(f"Exporting and quantizing sentiment model {SENTIMENT_MODEL}...")
+        ort_model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL, export=True)
+        quantizer = ORTQuantizer.from_pretrained(ort_model)
+        quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=save_dir, quantization_config=quantization_config)
+        AutoTokenizer.from_pretrained(SENTIMENT_MODEL, use_fast=True).save_pretrained(save_dir)
+    
+    logger.info(f"Loading quantized sentiment model from {save_dir}...")
+    model = ORTModelForSequenceClassification.from_pretrained(save_dir, file_name=model_file.name)
+    tokenizer = AutoTokenizer.from_pretrained(save_dir, use_fast=True)
+    return pipeline("text-classification", model=model, tokenizer=tokenizer)
+
+
+def fetch_realtime_news(
+    ticker: str,
+    limit: int = None,
+    stock: Optional[yf.Ticker] = None,
+    get_info: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
     """
     Fetch latest news articles for a given ticker using NewsAPI.
     
     Args:
         ticker: Stock ticker symbol
         limit: Maximum number of articles to fetch
+        stock: Shared yfinance Ticker for this symbol (created if omitted)
+        get_info: Shared getter for ``stock.info``, called only on a cache miss
     
     Returns:
         Dictionary containing news articles and sentiment analysis
@@ -27,9 +124,15 @@ def fetch_realtime_news(ticker: str, limit: int = None) -> Dict[str, Any]:
     
     try:
         logger.info(f"Fetching news for {ticker}...")
+        
+        cache_key = ("news", ticker, limit)
+        cached = file_cache.get(cache_key, Config.CACHE_TTL_NEWS)
+        if cached is not None:
+            return cached
     
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        if stock is None:
+            stock = yf.Ticker(ticker)
+        info = get_info() if get_info is not None else stock.info
         company_name = safe_extract(info, "longName", default="N/A")
         
         # Use NewsAPI
@@ -44,28 +147,34 @@ def fetch_realtime_news(ticker: str, limit: int = None) -> Dict[str, Any]:
             "pageSize": limit,
         }
         
-        response = requests.get(url, params=params, timeout=Config.TIMEOUT_SECONDS)
+        response = _HTTP.get(url, params=params, timeout=Config.TIMEOUT_SECONDS)
         response.raise_for_status()
         
         data = response.json()
         articles = data.get("articles", [])
         
         # Process articles
-        processed_articles = []
-        sentiment_scores = []
+        articles = articles[:limit]
+        try:
+            sentiment_scores = calculate_articles_sentiments(articles)
+            sentiment_ok = True
+        except Exception as e:
+            # Degrade to neutral, but don't cache the placeholder scores
+            logger.warning(f"Error in sentiment analysis: {e}")
+            sentiment_scores = [0.0] * len(articles)
+            sentiment_ok = False
         
-        for article in articles[:limit]:
-            article_sentiment = calculate_article_sentiment(article)
-            sentiment_scores.append(article_sentiment)
-            
-            processed_articles.append({
+        processed_articles = [
+            {
                 "title": article.get("title"),
                 "source": safe_extract(article, "source", "name", default="Unknown"),
                 "published_at": article.get("publishedAt"),
                 "url": article.get("url"),
                 "description": article.get("description"),
                 "sentiment_score": article_sentiment,
-            })
+            }
+            for article, article_sentiment in zip(articles, sentiment_scores)
+        ]
         
         # Calculate aggregate sentiment
         overall_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
@@ -79,6 +188,8 @@ def fetch_realtime_news(ticker: str, limit: int = None) -> Dict[str, Any]:
             "sentiment_label": get_sentiment_label(overall_sentiment),
         }
         
+        if sentiment_ok:
+            file_cache.set(cache_key, news_data)
         logger.info(f"✓ News fetch completed for {ticker} ({len(processed_articles)} articles)")
         return news_data
     
@@ -93,47 +204,57 @@ def fetch_realtime_news(ticker: str, limit: int = None) -> Dict[str, Any]:
         }
 
 
-def calculate_article_sentiment(article: Dict[str, Any]) -> float:
+def calculate_articles_sentiments(articles: List[Dict[str, Any]]) -> List[float]:
     """
-    Sentiment analysis using HuggingFace multilingual model.
-    Returns score between -1 (very negative) and 1 (very positive).
+    Batched sentiment analysis using HuggingFace financial news model.
+    Returns one score per article between -1 (very negative) and 1 (very positive).
+    Raises if the sentiment model cannot be loaded or run.
     """
-
-    try:
-        title = (article.get("title") or "").strip()
-        description = (article.get("description") or "").strip()
-        
-        # Combine title and description
-        text = f"{title} {description}".strip()
-        
-        if not text or len(text) < 3:
-            return 0.0
-        
-        # Load sentiment analysis model
-        sentiment_pipeline = pipeline(
-            "text-classification",
-            model="mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis"
+    # Combine title and description for each article
+    texts = [
+        f"{(article.get('title') or '').strip()} {(article.get('description') or '').strip()}".strip()
+        for article in articles
+    ]
+    sentiments = [0.0] * len(texts)
+    
+    # Skip empty texts, they stay neutral
+    indices = [i for i, text in enumerate(texts) if len(text) >= 3]
+    if not indices:
+        return sentiments
+    
+    sentiment_pipeline = _get_sentiment_pipeline()
+    
+    # Score all articles in a single batched call
+    with _SENTIMENT_INFERENCE_LOCK:
+        results = sentiment_pipeline(
+            [texts[i] for i in indices],
+            batch_size=16,
+            # headline + lead sentence carry the sentiment signal
+            truncation=True,
+            max_length=128,
+            padding=True,
         )
+    
+    for i, result in zip(indices, results):
+        sentiments[i] = _to_signed_score(result)
+    
+    return sentiments
 
-        # Get sentiment from model
-        result = sentiment_pipeline(text)[0]
-        
-        label = result["label"].lower()
-        score = result["score"]
-        
-        # Map to -1 to 1 scale
-        if "positive" in label:
-            sentiment = score
-        elif "negative" in label:
-            sentiment = -score
-        else:  # neutral
-            sentiment = 0.0
-        
-        return round(sentiment, 2)
+
+def _to_signed_score(result: Dict[str, Any]) -> float:
+    """Map a classifier label/score pair to the -1 to 1 scale"""
+    label = result["label"].lower()
+    score = result["score"]
     
-    except Exception as e:
-        logger.warning(f"Error in sentiment analysis: {e}")
-        return 0.0
+    if "positive" in label:
+        sentiment = score
+    elif "negative" in label:
+        sentiment = -score
+    else:  # neutral
+        sentiment = 0.0
+    
+    return round(sentiment, 2)
+
 
 def get_sentiment_label(sentiment_score: float) -> str:
     """Convert sentiment score to label"""
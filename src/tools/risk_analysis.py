@@ -1,19 +1,32 @@
 import logging
-import yfinance as yf
-from typing import Dict, Any
+import math
+from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import pandas as pd
 
 from src.config import Config
+from src.utils import fetch_history, slice_history
 
 logger = logging.getLogger(__name__)
 
-def calculate_risk_metrics(ticker: str, period_days: int = 252) -> Dict[str, Any]:
+_ANNUALIZER = math.sqrt(252)  # daily -> annual volatility
+
+# Decimal places per reported metric (default 4)
+_PRECISION = {"beta": 2, "sharpe_ratio": 2}
+
+def calculate_risk_metrics(
+    ticker: str,
+    period_days: int = 252,
+    hist: Optional[pd.DataFrame] = None,
+) -> Dict[str, Any]:
     """
     Calculate risk metrics including volatility and beta.
     
     Args:
         ticker: Stock ticker symbol
         period_days: Number of days for analysis (252 = 1 year)
+        hist: Pre-fetched daily history covering at least period_days (fetched if omitted)
     
     Returns:
         Dictionary containing risk metrics
@@ -21,57 +34,62 @@ def calculate_risk_metrics(ticker: str, period_days: int = 252) -> Dict[str, Any
     try:
         logger.info(f"Calculating risk metrics for {ticker}...")
         
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period=f"{period_days}d")
+        # Benchmark history is cached, so a portfolio run fetches it only once
+        if hist is None:
+            # Fetch stock and benchmark history concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                hist_future = executor.submit(fetch_history, ticker, period_days)
+                benchmark_future = executor.submit(fetch_history, Config.BENCHMARK_INDEX, period_days)
+                hist = hist_future.result()
+                benchmark_hist = benchmark_future.result()
+        else:
+            hist = slice_history(hist, period_days)
+            benchmark_hist = fetch_history(Config.BENCHMARK_INDEX, period_days)
         
         if hist.empty or len(hist) < 2:
             raise ValueError(f"Insufficient data for {ticker}")
         
-        # Calculate daily returns
-        daily_returns = hist["Close"].pct_change().dropna()
+        closes = _align_closes(ticker, hist, benchmark_hist)
+        stock_closes = closes[ticker].dropna()
         
-        if daily_returns.empty:
-            raise ValueError(f"Could not calculate returns for {ticker}")
+        if len(stock_closes) < 2:
+            raise ValueError(f"Insufficient data for {ticker}")
         
-        # Volatility (annualized)
-        volatility = daily_returns.std() * np.sqrt(252)
+        prices = np.ascontiguousarray(stock_closes.to_numpy(), dtype=np.float64)
         
-        # Beta (vs benchmark index)
-        benchmark = yf.Ticker(Config.BENCHMARK_INDEX)
-        benchmark_hist = benchmark.history(period=f"{period_days}d")
-        benchmark_returns = benchmark_hist["Close"].pct_change().dropna()
+        # Beta (vs benchmark index) is measured over the dates both series traded
+        aligned = np.ascontiguousarray(
+            closes[[ticker, Config.BENCHMARK_INDEX]].dropna(how="any").to_numpy(),
+            dtype=np.float64,
+        )
         
-        beta = None
-        if len(benchmark_returns) > 0:
-            # Align dates
-            common_dates = daily_returns.index.intersection(benchmark_returns.index)
-            if len(common_dates) > 0:
-                stock_ret = daily_returns[common_dates]
-                market_ret = benchmark_returns[common_dates]
-                covariance = np.cov(stock_ret, market_ret)[0][1]
-                market_variance = np.var(market_ret)
-                beta = covariance / market_variance if market_variance != 0 else None
+        # Volatility, mean return, VaR (95%), max drawdown and beta
+        daily_vol, mean_return, var_95, max_drawdown, beta = _risk_stats(prices, aligned)
+        
+        # Volatility (annualized)
+        volatility = daily_vol * _ANNUALIZER
+        beta = None if math.isnan(beta) else beta
         
         # Sharpe Ratio (assuming risk-free rate of 2%)
         risk_free_rate = 0.02
-        excess_returns = daily_returns.mean() * 252 - risk_free_rate
+        excess_returns = mean_return * 252 - risk_free_rate
         sharpe_ratio = excess_returns / volatility if volatility != 0 else 0
         
-        # Value at Risk (95% confidence)
-        var_95 = daily_returns.quantile(0.05)
-        
         risk_metrics = {
             "ticker": ticker,
-            "volatility_annual": round(volatility, 4),
-            "beta": round(beta, 2) if beta else None,
-            "sharpe_ratio": round(sharpe_ratio, 2),
-            "var_95": round(var_95, 4),
-            "max_drawdown": round((daily_returns.cumsum().min()), 4),
+            "volatility_annual": volatility,
+            "beta": beta,
+            "sharpe_ratio": sharpe_ratio,
+            "var_95": var_95,
+            "max_drawdown": max_drawdown,
             "volatility_assessment": get_volatility_assessment(volatility),
         }
         
         logger.info(f"Risk metrics calculation completed for {ticker}")
-        return risk_metrics
+        return {
+            key: round(float(value), _PRECISION.get(key, 4)) if isinstance(value, float) else value
+            for key, value in risk_metrics.items()
+        }
     
     except Exception as e:
         logger.error(f"Error calculating risk metrics for {ticker}: {e}")
@@ -82,6 +100,84 @@ def calculate_risk_metrics(ticker: str, period_days: int = 252) -> Dict[str, Any
         }
 
 
+def calculate_risk_metrics_batch(
+    tickers: List[str],
+    period_days: int = 252,
+    max_workers: int = Config.MAX_PARALLEL_STOCKS,
+) -> List[Dict[str, Any]]:
+    """
+    Calculate risk metrics for several tickers concurrently.
+    
+    Args:
+        tickers: Stock ticker symbols
+        period_days: Number of days for analysis (252 = 1 year)
+        max_workers: Maximum number of concurrent fetches
+    
+    Returns:
+        List of risk metric dictionaries, in the same order as tickers
+    """
+    if not tickers:
+        return []
+    
+    # Network-bound; the benchmark history is fetched once via the shared cache
+    with ThreadPoolExecutor(max_workers=min(len(tickers), max_workers)) as executor:
+        return list(executor.map(lambda t: calculate_risk_metrics(t, period_days), tickers))
+
+
+def _align_closes(ticker: str, hist: pd.DataFrame, benchmark_hist: pd.DataFrame) -> pd.DataFrame:
+    """Combine stock and benchmark closes into one frame indexed by trading date"""
+    def by_date(closes: pd.Series) -> pd.Series:
+        # Exchanges report in their own timezones; daily bars align on the date
+        if closes.index.tz is not None:
+            closes = closes.tz_localize(None)
+        return closes
+    
+    return pd.DataFrame({
+        ticker: by_date(hist["Close"]),
+        Config.BENCHMARK_INDEX: (
+            by_date(benchmark_hist["Close"]) if not benchmark_hist.empty else pd.Series(dtype=float)
+        ),
+    })
+
+
+def _risk_stats(prices: np.ndarray, aligned: np.ndarray):
+    """
+    Vectorized risk statistics over daily closes.
+    
+    Args:
+        prices: Stock closes, oldest first
+        aligned: (n, 2) stock/benchmark closes on common dates, for beta
+    
+    Returns:
+        (daily volatility, mean daily return, 5% return quantile,
+         max drawdown, beta); beta is NaN when it is undefined
+    """
+    returns = np.diff(prices) / prices[:-1]
+    n = returns.size
+    
+    daily_vol = returns.std(ddof=1) if n > 1 else np.nan
+    
+    # 5% quantile with linear interpolation (pandas' default) via selection
+    pos = 0.05 * (n - 1)
+    lo = int(pos)
+    hi = min(lo + 1, n - 1)
+    part = np.partition(returns, (lo, hi))
+    var_95 = part[lo] + (part[hi] - part[lo]) * (pos - lo)
+    
+    # Largest peak-to-trough decline of the price curve
+    max_drawdown = (prices / np.maximum.accumulate(prices) - 1).min()
+    
+    beta = np.nan
+    if len(aligned) > 2:
+        aligned_returns = np.diff(aligned, axis=0) / aligned[:-1]
+        # One 2x2 covariance matrix gives both terms: beta = cov(s, m) / var(m)
+        cov = np.cov(aligned_returns[:, 0], aligned_returns[:, 1], ddof=0)
+        if cov[1, 1] != 0:
+            beta = cov[0, 1] / cov[1, 1]
+    
+    return daily_vol, returns.mean(), var_95, max_drawdown, beta
+
+
 def get_volatility_assessment(volatility: float) -> str:
     """Assess volatility level"""
     if volatility < 0.2:
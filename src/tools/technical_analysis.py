@@ -1,23 +1,42 @@
 import logging
-import yfinance as yf
-from typing import Dict, Optional, Any
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
 
 from src.config import Config
+from src.indicators import calculate_sma, calculate_rsi
 from src.utils import (
-    calculate_sma, 
-    calculate_rsi
+    fetch_history,
+    slice_history,
 )
 
 logger = logging.getLogger(__name__)
 
+# Bound once at import to avoid repeated Config lookups on the per-ticker path
+_SMA_SHORT = Config.TECHNICAL_PERIOD_SHORT
+_SMA_LONG = Config.TECHNICAL_PERIOD_LONG
+_RSI_PERIOD = Config.RSI_PERIOD
+_RSI_OVERBOUGHT = Config.RSI_OVERBOUGHT
+_RSI_OVERSOLD = Config.RSI_OVERSOLD
 
-def get_technical_indicators(ticker: str, period_days: int = 200) -> Dict[str, Any]:
+# Indexed by sign(sma_50 - sma_200) + 1 and by (current volume > 1.2x average)
+_CROSS_STATUS = ("Death Cross (Bearish)", None, "Golden Cross (Bullish)")
+_VOLUME_TREND = ("Normal", "High")
+
+
+def get_technical_indicators(
+    ticker: str,
+    period_days: int = 200,
+    hist: Optional[pd.DataFrame] = None,
+) -> Dict[str, Any]:
     """
     Calculate technical indicators including SMA and RSI.
     
     Args:
         ticker: Stock ticker symbol
         period_days: Number of days of historical data to fetch
+        hist: Pre-fetched daily history covering at least period_days (fetched if omitted)
     
     Returns:
         Dictionary containing technical indicators
@@ -25,43 +44,46 @@ def get_technical_indicators(ticker: str, period_days: int = 200) -> Dict[str, A
     try:
         logger.info(f"Calculating technical indicators for {ticker}...")
         
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period=f"{period_days}d")
+        if hist is None:
+            hist = fetch_history(ticker, period_days)
+        else:
+            hist = slice_history(hist, period_days)
         
         if hist.empty:
             raise ValueError(f"No historical data available for {ticker}")
         
-        prices = hist["Close"].tolist()
+        # Keep prices as an array so the indicator helpers stay vectorized
+        prices = hist["Close"].to_numpy()
         
         # Calculate moving averages
-        sma_50 = calculate_sma(prices, Config.TECHNICAL_PERIOD_SHORT)
-        sma_200 = calculate_sma(prices, Config.TECHNICAL_PERIOD_LONG)
+        sma_50 = calculate_sma(prices, _SMA_SHORT)
+        sma_200 = calculate_sma(prices, _SMA_LONG)
         
         # Calculate RSI
-        rsi = calculate_rsi(prices, Config.RSI_PERIOD)
+        rsi = calculate_rsi(prices, _RSI_PERIOD)
         
         # Current price
-        current_price = prices[-1] if prices else None
+        current_price = float(prices[-1]) if len(prices) else None
         
         # Price change
         price_change = None
         price_change_pct = None
         if len(prices) > 1:
-            price_change = current_price - prices[0]
+            price_change = current_price - float(prices[0])
             price_change_pct = (price_change / prices[0] * 100) if prices[0] != 0 else 0
         
         # Golden cross / Death cross detection
         golden_cross = None
         if sma_50 and sma_200:
-            if sma_50 > sma_200:
-                golden_cross = "Golden Cross (Bullish)"
-            elif sma_50 < sma_200:
-                golden_cross = "Death Cross (Bearish)"
+            golden_cross = _CROSS_STATUS[(sma_50 > sma_200) - (sma_50 < sma_200) + 1]
         
-        # Volume analysis
-        avg_volume = hist["Volume"].mean() if "Volume" in hist.columns else None
-        current_volume = hist["Volume"].iloc[-1] if "Volume" in hist.columns else None
-        volume_trend = "High" if current_volume and avg_volume and current_volume > avg_volume * 1.2 else "Normal"
+        # Volume analysis (pull each column out once; nan-aware like pandas reductions)
+        volume = hist["Volume"].to_numpy() if "Volume" in hist.columns else None
+        avg_volume = float(np.nanmean(volume)) if volume is not None else None
+        current_volume = float(volume[-1]) if volume is not None else None
+        volume_trend = "Normal"
+        if volume is not None:
+            volume_trend = _VOLUME_TREND[bool(current_volume > avg_volume * 1.2)]
         
         indicators = {
             "ticker": ticker,
@@ -77,8 +99,8 @@ def get_technical_indicators(ticker: str, period_days: int = 200) -> Dict[str, A
             "avg_volume": avg_volume,
             "current_volume": current_volume,
             "volume_trend": volume_trend,
-            "high_52w": hist["High"].max(),
-            "low_52w": hist["Low"].min(),
+            "high_52w": float(np.nanmax(hist["High"].to_numpy())),
+            "low_52w": float(np.nanmin(hist["Low"].to_numpy())),
         }
         
         logger.info(f"Technical analysis completed for {ticker}")
@@ -93,14 +115,37 @@ def get_technical_indicators(ticker: str, period_days: int = 200) -> Dict[str, A
         }
 
 
+def get_technical_indicators_batch(
+    tickers: List[str],
+    period_days: int = 200,
+    max_workers: int = Config.MAX_PARALLEL_STOCKS,
+) -> List[Dict[str, Any]]:
+    """
+    Calculate technical indicators for several tickers concurrently.
+    
+    Args:
+        tickers: Stock ticker symbols
+        period_days: Number of days of historical data to fetch
+        max_workers: Maximum number of concurrent fetches
+    
+    Returns:
+        List of indicator dictionaries, in the same order as tickers
+    """
+    if not tickers:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=min(len(tickers), max_workers)) as executor:
+        return list(executor.map(lambda t: get_technical_indicators(t, period_days), tickers))
+
+
 def get_rsi_signal(rsi: Optional[float]) -> Optional[str]:
     """Convert RSI value to trading signal"""
     if rsi is None:
         return None
     
-    if rsi >= Config.RSI_OVERBOUGHT:
+    if rsi >= _RSI_OVERBOUGHT:
         return "Overbought - Potential Sell Signal"
-    elif rsi <= Config.RSI_OVERSOLD:
+    elif rsi <= _RSI_OVERSOLD:
         return "Oversold - Potential Buy Signal"
     else:
         return "Neutral"
@@ -1,10 +1,16 @@
 import logging
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
 from datetime import datetime
+import functools
 import json
 import os
+import threading
+import time
 from src.config import Config
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,35 +27,76 @@ def safe_extract(data: Dict, *keys, default: Any = None) -> Any:
     return current
 
 
-def calculate_sma(prices: List[float], period: int) -> Optional[float]:
-    """Calculate Simple Moving Average"""
-    if not prices or len(prices) < period:
-        return None
-    return sum(prices[-period:]) / period
+def ttl_cache(ttl_seconds: int, cache_if: Optional[Callable[[Any], bool]] = None) -> Callable:
+    """
+    Memoize a function's results in memory for ttl_seconds.
+    Concurrent calls with the same arguments wait for a single fetch.
+    Results for which cache_if returns False are not stored.
+    """
+    def decorator(func: Callable) -> Callable:
+        cache: Dict[Tuple, Tuple[float, Any]] = {}
+        key_locks: Dict[Tuple, threading.Lock] = {}
+        waiters: Dict[Tuple, int] = {}  # callers holding each key's lock object
+        guard = threading.Lock()
+        
+        def evict_expired(now: float) -> None:
+            # Called with guard held; a key's lock is only dropped once no
+            # caller holds it, so concurrent callers always share one lock
+            for key, (stored_at, _) in list(cache.items()):
+                if now - stored_at >= ttl_seconds:
+                    del cache[key]
+                    if key not in waiters:
+                        del key_locks[key]
+        
+        @functools.wraps(func)
+        def wrapper(*args):
+            with guard:
+                key_lock = key_locks.setdefault(args, threading.Lock())
+                waiters[args] = waiters.get(args, 0) + 1
+            
+            try:
+                with key_lock:
+                    entry = cache.get(args)
+                    if entry is not None and time.monotonic() - entry[0] < ttl_seconds:
+                        return entry[1]
+                    
+                    value = func(*args)
+                    with guard:
+                        now = time.monotonic()
+                        evict_expired(now)
+                        if cache_if is None or cache_if(value):
+                            cache[args] = (now, value)
+                    return value
+            finally:
+                with guard:
+                    waiters[args] -= 1
+                    if not waiters[args]:
+                        del waiters[args]
+                        if args not in cache:
+                            del key_locks[args]
+        
+        return wrapper
+    return decorator
 
 
-def calculate_rsi(prices: List[float], period: int = 14) -> Optional[float]:
-    """Calculate Relative Strength Index (RSI)"""
-    if not prices or len(prices) < period + 1:
-        return None
-    
-    deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-    
-    gains = [delta if delta > 0 else 0 for delta in deltas]
-    losses = [-delta if delta < 0 else 0 for delta in deltas]
-    
-    avg_gain = sum(gains[-period:]) / period
-    avg_loss = sum(losses[-period:]) / period
+# Empty frames usually mean a transient yfinance failure, so retry next call
+@ttl_cache(Config.HISTORY_CACHE_TTL, cache_if=lambda hist: not hist.empty)
+def fetch_history(symbol: str, period_days: int) -> "pd.DataFrame":
+    """Fetch daily price history, reusing recent results for the same symbol and period"""
+    import yfinance as yf
     
-    if avg_loss == 0:
-        return 100 if avg_gain > 0 else 0
-    
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    
-    return round(rsi, 2)
+    return yf.Ticker(symbol).history(period=f"{period_days}d")
+
 
+def slice_history(hist: "pd.DataFrame", period_days: int) -> "pd.DataFrame":
+    """Restrict a daily price history to its last period_days calendar days"""
+    if hist.empty:
+        return hist
+    import pandas as pd
     
+    return hist.loc[hist.index >= hist.index[-1] - pd.Timedelta(days=period_days)]
+
+
 def init_langsmith_tracing():
     """
     Initialize LangSmith / LangChain tracing based on environment variables.